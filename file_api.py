@@ -1,750 +1,947 @@
-from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
-from datetime import datetime
-import os
-from dotenv import load_dotenv
-import requests
-from bs4 import BeautifulSoup
-import re
-import validators
-from urllib.parse import urljoin
-import time
-import random
-import traceback
-from bson.objectid import ObjectId
-
-# Load environment variables from .env file
-load_dotenv()
-
-file_api = Blueprint('file_api', __name__)  # Using Blueprint instead of Flask
-
-# MongoDB connection configuration
-MONGO_URI = os.environ.get('MONGO_URI')
-DB_NAME = 'scrapper'
-SOURCE_COLLECTION = 'Content_Links'
-LINKS_COLLECTION = 'Links_to_scrap'
-PROCESSED_COLLECTION = 'Processed_Links'
-CONTENT_COLLECTION = 'scrapped_text'
-
-def get_mongo_client():
-    """Establish connection to MongoDB"""
-    client = MongoClient(MONGO_URI)
-    return client
-
-def is_valid_url(url):
-    """Enhanced URL validation function"""
-    try:
-        return validators.url(url)
-    except:
-        # Some URLs might cause validators to raise exceptions
-        return False
-
-def is_valid_content_url(url):
-    """Check if URL is likely to contain text content"""
-    # Skip common non-text content URLs and query params that indicate non-content
-    if re.search(r'\.(jpg|jpeg|png|gif|svg|webp|mp4|mp3|pdf|zip|exe|js|css|xml)$', url, re.IGNORECASE):
-        return False
-        
-    # Skip common non-content paths
-    if re.search(r'/(login|logout|signin|signout|register|cart|checkout|api)/?$', url, re.IGNORECASE):
-        return False
-        
-    return True
-
-def contains_text_in_url(url):
-    """Check if URL contains text content indicators"""
-    # Look for words that suggest text content in the URL
-    text_indicators = [
-        'article', 'blog', 'post', 'news', 'story', 'content', 
-        'text', 'page', 'read', 'view', 'doc', 'document', 
-        'info', 'about', 'faq', 'help', 'guide', 'tutorial',
-        'wiki', 'knowledge', 'learn', 'support'
-    ]
-    
-    # Convert URL to lowercase for case-insensitive matching
-    url_lower = url.lower()
-    
-    # Check if any text indicator appears in the URL
-    for indicator in text_indicators:
-        if indicator in url_lower:
-            return True
-            
-    return False
-
-def extract_urls_from_page(url):
-    """
-    Extract all URLs from a page that likely contain text content
-    """
-    try:
-        # Add user agent to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Make request to the URL
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all anchor tags
-        all_links = soup.find_all('a', href=True)
-        
-        # Base URL for resolving relative URLs
-        base_url = url
-        
-        # Check if the HTML has a base tag
-        base_tag = soup.find('base', href=True)
-        if base_tag:
-            base_url = base_tag['href']
-        
-        # Extract URLs
-        valid_urls = []
-        
-        for link in all_links:
-            href = link['href'].strip()
-            
-            # Skip empty hrefs, javascript:, mailto:, tel: links
-            if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
-                continue
-                
-            try:
-                # Convert relative URLs to absolute URLs
-                full_url = urljoin(base_url, href)
-                
-                # Skip invalid URLs and non-content URLs
-                if not is_valid_url(full_url) or not is_valid_content_url(full_url):
-                    continue
-                    
-                valid_urls.append(full_url)
-            except Exception as e:
-                print(f"Error processing URL {href}: {str(e)}")
-                continue
-        
-        return {
-            'status': 'success',
-            'url': url,
-            'links_found': len(valid_urls),
-            'links': valid_urls
-        }
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            'status': 'error',
-            'url': url,
-            'error': f"Request error: {str(e)}"
-        }
-    except Exception as e:
-        return {
-            'status': 'error',
-            'url': url,
-            'error': f"Error: {str(e)}",
-            'traceback': traceback.format_exc()
-        }
-
-def scrape_link(url):
-    """Scrape the content from a given URL"""
-    try:
-        # Add user agent to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Make request to the URL
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract all text content (removing script and style elements)
-        for script in soup(["script", "style"]):
-            script.extract()
-            
-        # Get text and clean it
-        text = soup.get_text(separator=' ', strip=True)
-        
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
-        
-        return {
-            'status': 'success',
-            'content': text
-        }
-    
-    except Exception as e:
-        return {
-            'status': 'error',
-            'error': str(e)
-        }
-
-@file_api.route('/recursive-crawl', methods=['POST'])
-def recursive_crawl():
-    """
-    Crawl a page from the provided URL in the POST body only if the Links_to_scrap collection is empty.
-    Otherwise, continue crawling existing links.
-    """
-    client = None
-    try:
-        # Get MongoDB client
-        client = get_mongo_client()
-        db = client[DB_NAME]
-        
-        # Get the Links_to_scrap collection
-        links_collection = db[LINKS_COLLECTION]
-        
-        # Check if the Links_to_scrap collection is empty
-        is_collection_empty = links_collection.count_documents({}) == 0
-        
-        # Get the URL and depth from the request body (only if the collection is empty)
-        data = request.get_json()
-        url = None
-        process_depth = 1  # Default depth
-        
-        if is_collection_empty:
-            if data and 'url' in data:
-                # Use URL directly from request
-                url = data['url']
-                
-                # Check if depth parameter is provided
-                if 'depth' in data:
-                    try:
-                        process_depth = int(data['depth'])
-                    except:
-                        process_depth = 1
-                
-                # Validate URL format
-                if not is_valid_url(url):
-                    return jsonify({
-                        'status': 'error',
-                        'message': f'Invalid URL format: {url}',
-                        'timestamp': datetime.now().isoformat()
-                    }), 400
-                
-                # Add the starting URL to Links_to_scrap
-                links_collection.insert_one({
-                    'link': url,
-                    'added_at': datetime.now(),
-                    'is_crawled': False,
-                    'depth': 0  # Starting URL is depth 0
-                })
-            else:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'URL is required in the POST body for the first crawl.',
-                    'timestamp': datetime.now().isoformat()
-                }), 400
-        
-        # Process up to process_depth levels
-        for current_depth in range(process_depth):
-            # Find an uncrawled link at the current depth
-            query = {'is_crawled': {'$ne': True}}
-            if url and current_depth == 0:
-                # For first iteration, use the provided URL if available
-                query['link'] = url
-            else:
-                # For subsequent iterations, respect the depth level
-                query['depth'] = current_depth
-                
-            link_doc = links_collection.find_one(query)
-            
-            if not link_doc:
-                # If no link at current depth, try any uncrawled link
-                link_doc = links_collection.find_one({'is_crawled': {'$ne': True}})
-                
-                if not link_doc:
-                    return jsonify({
-                        'status': 'info',
-                        'message': f'No more links to crawl at depth {current_depth}',
-                        'timestamp': datetime.now().isoformat()
-                    })
-            
-            url_to_crawl = link_doc['link']
-            current_depth = link_doc.get('depth', 0)
-            processed_collection = db[PROCESSED_COLLECTION]
-            
-            # Check if this is Wikipedia or similar content site
-            is_wiki = 'wikipedia.org' in url_to_crawl or 'wiki' in url_to_crawl.lower()
-            
-            # Extract URLs from the current page with enhanced extraction
-            try:
-                # Add user agent to avoid being blocked
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                
-                # Make request to the URL
-                response = requests.get(url_to_crawl, headers=headers, timeout=30)
-                response.raise_for_status()  # Raise exception for 4XX/5XX responses
-                
-                # Parse the HTML content
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find all anchor tags
-                all_links = soup.find_all('a', href=True)
-                
-                # Base URL for resolving relative URLs
-                base_url = url_to_crawl
-                
-                # Check if the HTML has a base tag
-                base_tag = soup.find('base', href=True)
-                if base_tag:
-                    base_url = base_tag['href']
-                
-                # Extract URLs
-                valid_urls = []
-                
-                # For Wikipedia, focus on main content area
-                if is_wiki:
-                    # Try to find the main content div
-                    content_div = soup.find('div', {'id': 'mw-content-text'})
-                    if content_div:
-                        all_links = content_div.find_all('a', href=True)
-                
-                for link in all_links:
-                    href = link['href'].strip()
-                    
-                    # Skip empty hrefs, javascript:, mailto:, tel: links
-                    if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
-                        continue
-                    
-                    try:
-                        # Convert relative URLs to absolute URLs
-                        full_url = urljoin(base_url, href)
-                        
-                        # Special handling for Wikipedia
-                        if is_wiki:
-                            # Keep only Wikipedia article links and filter out special pages
-                            if 'wikipedia.org/wiki/' in full_url:
-                                # Skip special pages
-                                if any(special in full_url for special in [
-                                    '/wiki/Special:', '/wiki/Talk:', '/wiki/Category:',
-                                    '/wiki/Help:', '/wiki/Portal:', '/wiki/Wikipedia:',
-                                    '/wiki/Template:', '/wiki/File:', '/wiki/MediaWiki:',
-                                    'action=edit', 'oldid=', 'diff=', 'printable=yes'
-                                ]):
-                                    continue
-                                valid_urls.append(full_url)
-                        else:
-                            # Default validation for non-Wikipedia sites
-                            if not is_valid_url(full_url) or not is_valid_content_url(full_url):
-                                continue
-                            valid_urls.append(full_url)
-                            
-                    except Exception as e:
-                        print(f"Error processing URL {href}: {str(e)}")
-                        continue
-                
-                # Remove duplicates
-                unique_links = list(set(valid_urls))
-                
-                # Store in Content_Links for reference
-                source_collection = db[SOURCE_COLLECTION]
-                source_document = {
-                    'source_url': url_to_crawl,
-                    'uniqueLinks': unique_links,
-                    'crawled_at': datetime.now(),
-                    'depth': current_depth
-                }
-                source_collection.insert_one(source_document)
-                
-                # Add all links to both Links_to_scrap and Processed_Links
-                links_added_to_crawl = 0
-                links_added_to_process = 0
-                
-                for link in unique_links:
-                    # For Wikipedia, don't apply the text_in_url filter
-                    should_process = is_wiki or contains_text_in_url(link)
-                    
-                    # Add to Links_to_scrap for further crawling
-                    existing_crawl = links_collection.find_one({'link': link})
-                    if not existing_crawl:
-                        crawl_doc = {
-                            'link': link,
-                            'added_at': datetime.now(),
-                            'is_crawled': False,
-                            'source_url': url_to_crawl,
-                            'depth': current_depth + 1  # Increment depth for next level
-                        }
-                        links_collection.insert_one(crawl_doc)
-                        links_added_to_crawl += 1
-                    
-                    # Add to Processed_Links for content scraping if it's a content link
-                    if should_process:
-                        existing_process = processed_collection.find_one({'link': link})
-                        if not existing_process:
-                            process_doc = {
-                                'link': link,
-                                'created_at': datetime.now(),
-                                'is_processed': False,
-                                'source_url': url_to_crawl,
-                                'has_text_in_url': True if is_wiki else contains_text_in_url(link),
-                                'depth': current_depth + 1
-                            }
-                            processed_collection.insert_one(process_doc)
-                            links_added_to_process += 1
-                
-                # Mark this link as crawled
-                links_collection.update_one(
-                    {'_id': link_doc['_id']},
-                    {'$set': {'is_crawled': True, 'crawled_at': datetime.now()}}
-                )
-                
-                # Add the URL to processed collection as well (if not already there)
-                existing_process = processed_collection.find_one({'link': url_to_crawl})
-                if not existing_process:
-                    process_doc = {
-                        'link': url_to_crawl,
-                        'created_at': datetime.now(),
-                        'is_processed': False,
-                        'source_url': 'seed_url' if current_depth == 0 else link_doc.get('source_url', 'unknown'),
-                        'has_text_in_url': True if is_wiki else contains_text_in_url(url_to_crawl),
-                        'depth': current_depth
-                    }
-                    processed_collection.insert_one(process_doc)
-            
-            except requests.exceptions.RequestException as e:
-                error_msg = f"Request error: {str(e)}"
-                links_collection.update_one(
-                    {'_id': link_doc['_id']},
-                    {'$set': {
-                        'is_crawled': True, 
-                        'crawled_at': datetime.now(),
-                        'error': error_msg
-                    }}
-                )
-                continue  # Try the next depth level
-                
-            except Exception as e:
-                error_msg = f"Error: {str(e)}"
-                links_collection.update_one(
-                    {'_id': link_doc['_id']},
-                    {'$set': {
-                        'is_crawled': True, 
-                        'crawled_at': datetime.now(),
-                        'error': error_msg
-                    }}
-                )
-                continue  # Try the next depth level
-        
-        # Return statistics after processing all depths
-        stats = {
-            'links_to_crawl': links_collection.count_documents({'is_crawled': {'$ne': True}}),
-            'links_crawled': links_collection.count_documents({'is_crawled': True}),
-            'links_to_scrape': processed_collection.count_documents({'is_processed': False}),
-            'links_scraped': processed_collection.count_documents({'is_processed': True})
-        }
-        
-        return jsonify({
-            'status': 'success',
-            'message': f'Crawling completed for {process_depth} depth levels',
-            'stats': stats,
-            'timestamp': datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        traceback_str = traceback.format_exc()
-        print(f"Error in crawling: {str(e)}\n{traceback_str}")
-        return jsonify({
-            'status': 'error',
-            'message': str(e),
-            'traceback': traceback_str,
-            'timestamp': datetime.now().isoformat()
-        }), 500
-    finally:
-        if client:
-            client.close()
-
-@file_api.route('/process-all-links', methods=['POST'])
-def process_all_links():
-    """Process all unprocessed links in the database at once."""
-    client = None
-    try:
-        # Get MongoDB client
-        client = get_mongo_client()
-        db = client[DB_NAME]
-        
-        # Get collections
-        processed_collection = db[PROCESSED_COLLECTION]
-        content_collection = db[CONTENT_COLLECTION]
-        
-        # Check how many unprocessed links exist
-        unprocessed_count = processed_collection.count_documents({'is_processed': False})
-        
-        if unprocessed_count == 0:
-            return jsonify({
-                'status': 'complete',
-                'message': 'No unprocessed links found',
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # Get all unprocessed links
-        unprocessed_links = list(processed_collection.find({'is_processed': False}))
-        
-        # Start processing all links
-        results = {
-            'total_unprocessed': unprocessed_count,
-            'processed': 0,
-            'success': 0,
-            'failed': 0,
-            'details': []
-        }
-        
-        # Process each link
-        for link_doc in unprocessed_links:
-            link = link_doc['link']
-            link_id = link_doc['_id']
-            
-            try:
-                # Scrape the link
-                result = scrape_single_link(db, link_doc)
-                
-                if result['status'] == 'success':
-                    results['success'] += 1
-                    results['details'].append({
-                        'link': link,
-                        'status': 'success',
-                        'content_length': result['content_length'],
-                        'title': result['title'],
-                        'content_id': result['content_id']
-                    })
-                else:
-                    results['failed'] += 1
-                    results['details'].append({
-                        'link': link,
-                        'status': 'error',
-                        'error': result['error']
-                    })
-                
-            except Exception as e:
-                results['failed'] += 1
-                results['details'].append({
-                    'link': link,
-                    'status': 'error',
-                    'error': str(e),
-                    'traceback': traceback.format_exc()
-                })
-            
-            results['processed'] += 1
-        
-        # Return results after processing all links
-        return jsonify({
-            'status': 'complete',
-            'message': f'Processed {results["processed"]} links ({results["success"]} success, {results["failed"]} failed)',
-            'results': results,
-            'timestamp': datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e),
-            'traceback': traceback.format_exc(),
-            'timestamp': datetime.now().isoformat()
-        }), 500
-    finally:
-        if client:
-            client.close()
-
-def scrape_single_link(db, link_doc):
-    """Helper function to scrape a single link"""
-    link = link_doc['link']
-    is_wiki = 'wikipedia.org' in link or 'wiki' in link.lower()
-    
-    # Get collections
-    processed_collection = db[PROCESSED_COLLECTION]
-    content_collection = db[CONTENT_COLLECTION]
-    
-    try:
-        # Add user agent to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Make request to the URL with increased timeout
-        response = requests.get(link, headers=headers, timeout=60)
-        response.raise_for_status()
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Get title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "Unknown Title"
-        
-        # Extract text based on the site type
-        if is_wiki:
-            # For Wikipedia, focus on the content div
-            content_div = soup.find('div', {'id': 'mw-content-text'})
-            if content_div:
-                # Remove unwanted elements
-                for unwanted in content_div.select('.thumb, .navbox, .infobox, table'):
-                    if unwanted:
-                        unwanted.extract()
-                
-                # Extract text from paragraphs
-                paragraphs = content_div.find_all(['p', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                text_parts = []
-                
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if text:
-                        if p.name.startswith('h'):
-                            text_parts.append(f"\n## {text}\n")
-                        else:
-                            text_parts.append(text)
-                
-                text = "\n\n".join(text_parts)
-                text = f"# {title_text}\n\n{text}"
-            else:
-                # Fallback to standard extraction
-                for script in soup(["script", "style"]):
-                    script.extract()
-                text = soup.get_text(separator=' ', strip=True)
-        else:
-            # Standard extraction for non-Wikipedia sites
-            for script in soup(["script", "style"]):
-                script.extract()
-            
-            # Get text and clean it
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Add title to the beginning
-            text = f"# {title_text}\n\n{text}"
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        # Create document for scraped content
-        content_document = {
-            'scrapped_content': text,
-            'content_link': link,
-            'scrape_date': datetime.now(),
-            'link_id': link_doc['_id'],
-            'source_url': link_doc.get('source_url', 'unknown'),
-            'depth': link_doc.get('depth', 0),
-            'title': title_text
-        }
-        
-        # Insert into content collection
-        result = content_collection.insert_one(content_document)
-        
-        # Update the link as processed
-        processed_collection.update_one(
-            {'_id': link_doc['_id']},
-            {'$set': {'is_processed': True, 'processed_at': datetime.now()}}
-        )
-        
-        return {
-            'status': 'success',
-            'link': link,
-            'content_length': len(text),
-            'title': title_text,
-            'content_id': str(result.inserted_id)
-        }
-    
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Request error: {str(e)}"
-        
-        # Update the link with error info
-        processed_collection.update_one(
-            {'_id': link_doc['_id']},
-            {
-                '$set': {
-                    'is_processed': True,
-                    'processed_at': datetime.now(),
-                    'error': error_msg
-                }
-            }
-        )
-        
-        return {
-            'status': 'error',
-            'link': link,
-            'error': error_msg
-        }
-    
-    except Exception as e:
-        error_msg = f"Processing error: {str(e)}"
-        tb = traceback.format_exc()
-        
-        # Update the link with error info
-        processed_collection.update_one(
-            {'_id': link_doc['_id']},
-            {
-                '$set': {
-                    'is_processed': True,
-                    'processed_at': datetime.now(),
-                    'error': error_msg,
-                    'traceback': tb
-                }
-            }
-        )
-        
-        return {
-            'status': 'error',
-            'link': link,
-            'error': error_msg,
-            'traceback': tb
-        }
-
-@file_api.route('/realtime-stats', methods=['GET'])
-def realtime_stats():
-    """Get real-time statistics for the frontend"""
-    client = None
-    try:
-        # Get MongoDB client
-        client = get_mongo_client()
-        db = client[DB_NAME]
-
-        # Get collections
-        links_to_scrap_collection = db[LINKS_COLLECTION]
-        processed_links_collection = db[PROCESSED_COLLECTION]
-        scrapped_text_collection = db[CONTENT_COLLECTION]
-
-        # Fetch all links in Links_to_scrap collection
-        links_to_scrap = list(links_to_scrap_collection.find({}, {'link': 1, '_id': 0}))
-        all_links = [link['link'] for link in links_to_scrap]
-
-        # Fetch total number of links in Processed_Links collection
-        total_number_of_links = processed_links_collection.count_documents({})
-
-        # Fetch number of scrapped links (number of links in scrapped_text collection)
-        scrapped_links_count = scrapped_text_collection.count_documents({})
-
-        # Fetch pending links (links in Processed_Links collection that are not yet processed)
-        pending_links = processed_links_collection.count_documents({'is_processed': False})
-
-        # Calculate total words scrapped
-        total_words_scrapped = 0
-        scrapped_documents = scrapped_text_collection.find({}, {'scrapped_content': 1, '_id': 0})
-        for doc in scrapped_documents:
-            if 'scrapped_content' in doc:
-                total_words_scrapped += len(doc['scrapped_content'].split())
-
-        # Prepare response
-        response = {
-            'Links': all_links,
-            'Total_Number_of_Links': total_number_of_links,
-            'Scrapped_Links': scrapped_links_count,  # Number of links in scrapped_text collection
-            'Pending_Links': pending_links,
-            'Total_Words_Scrapped': total_words_scrapped
-        }
-
-        return jsonify({
-            'status': 'success',
-            'data': response,
-            'timestamp': datetime.now().isoformat()
-        })
-
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e),
-            'traceback': traceback.format_exc(),
-            'timestamp': datetime.now().isoformat()
-        }), 500
-    finally:
-        if client:
-            client.close()
\ No newline at end of file
+from flask import Blueprint, request, jsonify
+from pymongo import MongoClient, UpdateOne, WriteConcern
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime
+import os
+from dotenv import load_dotenv
+import requests
+import aiohttp
+import asyncio
+from bs4 import BeautifulSoup
+from lxml import etree
+import re
+import functools
+from urllib.parse import urljoin, urlsplit
+import time
+import random
+import traceback
+from bson.objectid import ObjectId
+from concurrent.futures import ProcessPoolExecutor
+
+# Load environment variables from .env file
+load_dotenv()
+
+file_api = Blueprint('file_api', __name__)  # Using Blueprint instead of Flask
+
+# User agent to avoid being blocked
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Shared HTTP session: keep-alive reuses TCP/TLS connections to repeat hosts
+# (a bare requests.get opens a fresh one every call). requests' default
+# Accept-Encoding already lets servers gzip the HTML on the wire; don't
+# advertise encodings (like brotli) that urllib3 can't decode here.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+_session.headers.update({'User-Agent': USER_AGENT})
+
+# Cap fetched bodies: a handful of pathological pages otherwise balloon
+# parse CPU and memory out of all proportion to their content
+_MAX_BYTES = 5 * 1024 * 1024
+
+# MongoDB connection configuration
+MONGO_URI = os.environ.get('MONGO_URI')
+DB_NAME = 'scrapper'
+SOURCE_COLLECTION = 'Content_Links'
+LINKS_COLLECTION = 'Links_to_scrap'
+PROCESSED_COLLECTION = 'Processed_Links'
+CONTENT_COLLECTION = 'scrapped_text'
+
+# Single shared client: PyMongo's MongoClient is thread-safe and keeps its own
+# connection pool, so all requests reuse the same sockets instead of paying a
+# TCP + TLS + auth handshake every time.
+_client = MongoClient(
+    MONGO_URI,
+    maxPoolSize=50,
+    minPoolSize=5,
+    serverSelectionTimeoutMS=5000
+)
+db = _client[DB_NAME]
+_source_col = db[SOURCE_COLLECTION]
+_links_col = db[LINKS_COLLECTION]
+_processed_col = db[PROCESSED_COLLECTION]
+_content_col = db[CONTENT_COLLECTION]
+
+# Content writes use w=1 without journal ack: re-scraping a lost page is
+# cheaper than waiting on the journal for every batch
+_content_col_relaxed = _content_col.with_options(write_concern=WriteConcern(w=1, j=False))
+
+def _ensure_indexes():
+    """Create the indexes the crawler's bulk upserts rely on."""
+    try:
+        _links_col.create_index('link', unique=True)
+        _links_col.create_index([('is_crawled', 1), ('depth', 1)])
+        _processed_col.create_index('link', unique=True)
+        _processed_col.create_index('is_processed')
+        _content_col.create_index('content_link')
+
+        # Backfill is_crawled on any legacy docs missing the field so the
+        # hot queries can use {'is_crawled': False}, which walks the btree
+        # index ({'$ne': True} cannot)
+        _links_col.update_many(
+            {'is_crawled': {'$exists': False}},
+            {'$set': {'is_crawled': False}}
+        )
+
+        # Backfill word_count on content docs created before it was stored
+        # at insert time, so the stats aggregation can sum it server-side
+        _content_col.update_many(
+            {'word_count': {'$exists': False}},
+            [{'$set': {'word_count': {'$size': {'$split': ['$scrapped_content', ' ']}}}}]
+        )
+    except Exception as e:
+        print(f"Warning: could not create indexes: {str(e)}")
+
+_ensure_indexes()
+
+# Compiled once at import; these run in tight per-link loops during a crawl
+_BLANKLINE_RE = re.compile(r'\n\s*\n')
+_WS_RE = re.compile(r'\s+')
+
+# Scheme + host sanity check; a single DFA pass replaces the validators
+# package's much heavier validation pipeline
+_SCHEME_HOST_RE = re.compile(r'^https?://[^\s/$.?#].[^\s]*$', re.IGNORECASE)
+
+# Words that suggest text content in the URL
+_TEXT_INDICATORS = frozenset([
+    'article', 'blog', 'post', 'news', 'story', 'content',
+    'text', 'page', 'read', 'view', 'doc', 'document',
+    'info', 'about', 'faq', 'help', 'guide', 'tutorial',
+    'wiki', 'knowledge', 'learn', 'support'
+])
+
+# One scan of the URL decides content filtering and text indicators together;
+# match.lastgroup tells which alternation fired
+_URL_CLASSIFY_RE = re.compile(
+    r'(?P<bad_ext>\.(?:jpg|jpeg|png|gif|svg|webp|mp4|mp3|pdf|zip|exe|js|css|xml)$)'
+    r'|(?P<bad_path>/(?:login|logout|signin|signout|register|cart|checkout|api)/?$)'
+    r'|(?P<indicator>' + '|'.join(map(re.escape, sorted(_TEXT_INDICATORS))) + r')',
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=65536)
+def classify_url(url):
+    """Classify a URL in one pass: returns (is_valid, is_content, has_indicator)"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False, False, False
+
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return False, False, False
+
+    is_content = True
+    has_indicator = False
+    for match in _URL_CLASSIFY_RE.finditer(url):
+        if match.lastgroup == 'indicator':
+            has_indicator = True
+        else:
+            is_content = False
+
+    return True, is_content, has_indicator
+
+def _extract_hrefs(html, wiki_content_only=False):
+    """
+    Stream anchor hrefs out of raw HTML with lxml's pull parser.
+
+    Returns (base_href, hrefs) where base_href is the first <base href>
+    encountered or None. No full DOM is built: only the href strings are
+    kept and every element is cleared as soon as it has been seen. With
+    wiki_content_only, anchors inside the mw-content-text div are preferred,
+    falling back to all anchors if that div is absent.
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), recover=True)
+    parser.feed(html)
+
+    base_href = None
+    all_hrefs = []
+    content_hrefs = []
+    content_depth = 0
+    found_content = False
+
+    for event, el in parser.read_events():
+        if event == 'start':
+            # Track nesting below the Wikipedia content div
+            if content_depth:
+                content_depth += 1
+            elif wiki_content_only and el.tag == 'div' and el.get('id') == 'mw-content-text':
+                content_depth = 1
+                found_content = True
+
+            if el.tag == 'a':
+                href = el.get('href')
+                if href:
+                    all_hrefs.append(href)
+                    if content_depth:
+                        content_hrefs.append(href)
+            elif el.tag == 'base' and base_href is None and el.get('href'):
+                base_href = el.get('href')
+        else:
+            if content_depth:
+                content_depth -= 1
+            el.clear()  # drop the element's memory immediately
+
+    if wiki_content_only and found_content:
+        return base_href, content_hrefs
+    return base_href, all_hrefs
+
+@functools.lru_cache(maxsize=65536)
+def is_valid_url(url):
+    """Enhanced URL validation function"""
+    return bool(url) and bool(_SCHEME_HOST_RE.match(url))
+
+def _fetch_html(url, timeout=30):
+    """
+    Fetch a page through the shared session and return its raw bytes.
+
+    Streams the body and stops reading at _MAX_BYTES; non-HTML responses
+    and pages declaring an oversized Content-Length are skipped outright.
+    """
+    response = _session.get(url, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()  # Raise exception for 4XX/5XX responses
+
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and 'html' not in content_type:
+            raise ValueError(f"Skipping non-HTML content type: {content_type}")
+
+        if int(response.headers.get('Content-Length', 0)) > _MAX_BYTES:
+            raise ValueError(f"Skipping oversized page ({response.headers['Content-Length']} bytes)")
+
+        return response.raw.read(_MAX_BYTES, decode_content=True)
+    finally:
+        response.close()
+
+def _extract_links_from_html(html, page_url, is_wiki=False):
+    """
+    Resolve and classify every anchor in fetched HTML, returning a set of
+    valid content URLs. With is_wiki, keeps only Wikipedia article links
+    (scoped to the main content div) and skips special pages.
+    """
+    # Stream anchors out of the raw bytes instead of building a full DOM
+    base_href, hrefs = _extract_hrefs(html, wiki_content_only=is_wiki)
+
+    # Base URL for resolving relative URLs
+    base_url = base_href or page_url
+
+    # Extract URLs into a set so duplicates are rejected before any
+    # further classification work
+    valid_urls = set()
+
+    for href in hrefs:
+        href = href.strip()
+
+        # Skip empty hrefs, javascript:, mailto:, tel: links
+        if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
+            continue
+
+        try:
+            # Convert relative URLs to absolute URLs
+            full_url = urljoin(base_url, href)
+
+            # Skip duplicates before classifying
+            if full_url in valid_urls:
+                continue
+
+            # Special handling for Wikipedia
+            if is_wiki:
+                # Keep only Wikipedia article links and filter out special pages
+                if 'wikipedia.org/wiki/' in full_url:
+                    # Skip special pages
+                    if any(special in full_url for special in [
+                        '/wiki/Special:', '/wiki/Talk:', '/wiki/Category:',
+                        '/wiki/Help:', '/wiki/Portal:', '/wiki/Wikipedia:',
+                        '/wiki/Template:', '/wiki/File:', '/wiki/MediaWiki:',
+                        'action=edit', 'oldid=', 'diff=', 'printable=yes'
+                    ]):
+                        continue
+                    valid_urls.add(full_url)
+            else:
+                # Skip invalid URLs and non-content URLs in one pass
+                is_valid, is_content, _ = classify_url(full_url)
+                if not is_valid or not is_content:
+                    continue
+
+                valid_urls.add(full_url)
+        except Exception as e:
+            print(f"Error processing URL {href}: {str(e)}")
+            continue
+
+    return valid_urls
+
+def extract_urls_from_page(url):
+    """
+    Extract all URLs from a page that likely contain text content
+    """
+    try:
+        valid_urls = _extract_links_from_html(_fetch_html(url), url)
+
+        return {
+            'status': 'success',
+            'url': url,
+            'links_found': len(valid_urls),
+            'links': list(valid_urls)
+        }
+    
+    except requests.exceptions.RequestException as e:
+        return {
+            'status': 'error',
+            'url': url,
+            'error': f"Request error: {str(e)}"
+        }
+    except Exception as e:
+        return {
+            'status': 'error',
+            'url': url,
+            'error': f"Error: {str(e)}",
+            'traceback': traceback.format_exc()
+        }
+
+def scrape_link(url):
+    """Scrape the content from a given URL"""
+    try:
+        # Make request to the URL through the shared session
+        response = _session.get(url, timeout=30)
+        response.raise_for_status()  # Raise exception for 4XX/5XX responses
+        
+        # Parse the HTML content
+        soup = BeautifulSoup(response.content, 'lxml')
+        
+        # Extract all text content (removing script and style elements)
+        for script in soup(["script", "style"]):
+            script.extract()
+            
+        # Get text and clean it
+        text = soup.get_text(separator=' ', strip=True)
+        
+        # Remove excessive whitespace in one C-level pass
+        text = _WS_RE.sub(' ', text).strip()
+        
+        return {
+            'status': 'success',
+            'content': text
+        }
+    
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+@file_api.route('/recursive-crawl', methods=['POST'])
+def recursive_crawl():
+    """
+    Crawl a page from the provided URL in the POST body only if the Links_to_scrap collection is empty.
+    Otherwise, continue crawling existing links.
+    """
+    try:
+        # Get the Links_to_scrap collection
+        links_collection = _links_col
+        
+        # Check if the Links_to_scrap collection is empty
+        is_collection_empty = links_collection.count_documents({}) == 0
+        
+        # Get the URL and depth from the request body (only if the collection is empty)
+        data = request.get_json()
+        url = None
+        process_depth = 1  # Default depth
+        
+        if is_collection_empty:
+            if data and 'url' in data:
+                # Use URL directly from request
+                url = data['url']
+                
+                # Check if depth parameter is provided
+                if 'depth' in data:
+                    try:
+                        process_depth = int(data['depth'])
+                    except:
+                        process_depth = 1
+                
+                # Validate URL format
+                if not is_valid_url(url):
+                    return jsonify({
+                        'status': 'error',
+                        'message': f'Invalid URL format: {url}',
+                        'timestamp': datetime.now().isoformat()
+                    }), 400
+                
+                # Add the starting URL to Links_to_scrap
+                links_collection.insert_one({
+                    'link': url,
+                    'added_at': datetime.now(),
+                    'is_crawled': False,
+                    'depth': 0  # Starting URL is depth 0
+                })
+            else:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'URL is required in the POST body for the first crawl.',
+                    'timestamp': datetime.now().isoformat()
+                }), 400
+        
+        # Process up to process_depth levels
+        for current_depth in range(process_depth):
+            # Find an uncrawled link at the current depth
+            query = {'is_crawled': False}
+            if url and current_depth == 0:
+                # For first iteration, use the provided URL if available
+                query['link'] = url
+            else:
+                # For subsequent iterations, respect the depth level
+                query['depth'] = current_depth
+                
+            link_doc = links_collection.find_one(query)
+            
+            if not link_doc:
+                # If no link at current depth, try any uncrawled link
+                link_doc = links_collection.find_one({'is_crawled': False})
+                
+                if not link_doc:
+                    return jsonify({
+                        'status': 'info',
+                        'message': f'No more links to crawl at depth {current_depth}',
+                        'timestamp': datetime.now().isoformat()
+                    })
+            
+            url_to_crawl = link_doc['link']
+            current_depth = link_doc.get('depth', 0)
+            processed_collection = _processed_col
+            
+            # Check if this is Wikipedia or similar content site
+            is_wiki = 'wikipedia.org' in url_to_crawl or 'wiki' in url_to_crawl.lower()
+            
+            # Extract URLs from the current page with enhanced extraction
+            try:
+                # Fetch once; the same bytes feed link extraction and, below,
+                # the content scrape of this page
+                html = _fetch_html(url_to_crawl)
+
+                unique_links = list(_extract_links_from_html(html, url_to_crawl, is_wiki=is_wiki))
+                
+                # Store in Content_Links for reference
+                source_collection = _source_col
+                source_document = {
+                    'source_url': url_to_crawl,
+                    'uniqueLinks': unique_links,
+                    'crawled_at': datetime.now(),
+                    'depth': current_depth
+                }
+                source_collection.insert_one(source_document)
+                
+                # One $in query per collection replaces per-link existence
+                # probes: links already known don't need an op in the bulk
+                # payload at all.
+                existing_crawl_links = {
+                    d['link'] for d in links_collection.find(
+                        {'link': {'$in': unique_links}}, {'link': 1, '_id': 0})
+                }
+                existing_process_links = {
+                    d['link'] for d in processed_collection.find(
+                        {'link': {'$in': unique_links}}, {'link': 1, '_id': 0})
+                }
+
+                # Add all links to both Links_to_scrap and Processed_Links.
+                # The $setOnInsert upserts (backed by the unique index on
+                # 'link') keep concurrent crawlers race-safe, so the whole
+                # page ships as two bulk round trips.
+                crawl_ops = []
+                process_ops = []
+
+                for link in unique_links:
+                    # Reuse the cached classification from extraction; for
+                    # Wikipedia, don't apply the text_in_url filter
+                    _, _, has_indicator = classify_url(link)
+                    should_process = is_wiki or has_indicator
+
+                    # Add to Links_to_scrap for further crawling
+                    if link not in existing_crawl_links:
+                        crawl_ops.append(UpdateOne(
+                            {'link': link},
+                            {'$setOnInsert': {
+                                'added_at': datetime.now(),
+                                'is_crawled': False,
+                                'source_url': url_to_crawl,
+                                'depth': current_depth + 1  # Increment depth for next level
+                            }},
+                            upsert=True
+                        ))
+
+                    # Add to Processed_Links for content scraping if it's a content link
+                    if should_process and link not in existing_process_links:
+                        process_ops.append(UpdateOne(
+                            {'link': link},
+                            {'$setOnInsert': {
+                                'created_at': datetime.now(),
+                                'is_processed': False,
+                                'source_url': url_to_crawl,
+                                'has_text_in_url': True if is_wiki else has_indicator,
+                                'depth': current_depth + 1
+                            }},
+                            upsert=True
+                        ))
+
+                # Fold the tail writes into the same bulk payloads: marking
+                # this link crawled rides along with the new-link upserts,
+                # and the page itself is upserted into Processed_Links, so
+                # each collection still sees exactly one write round trip
+                crawl_ops.append(UpdateOne(
+                    {'_id': link_doc['_id']},
+                    {'$set': {'is_crawled': True, 'crawled_at': datetime.now()}}
+                ))
+
+                process_ops.append(UpdateOne(
+                    {'link': url_to_crawl},
+                    {'$setOnInsert': {
+                        'created_at': datetime.now(),
+                        'is_processed': False,
+                        'source_url': 'seed_url' if current_depth == 0 else link_doc.get('source_url', 'unknown'),
+                        'has_text_in_url': True if is_wiki else classify_url(url_to_crawl)[2],
+                        'depth': current_depth
+                    }},
+                    upsert=True
+                ))
+
+                crawl_result = links_collection.bulk_write(crawl_ops, ordered=False)
+                links_added_to_crawl = len(crawl_result.upserted_ids)
+
+                process_result = processed_collection.bulk_write(process_ops, ordered=False)
+                links_added_to_process = len(process_result.upserted_ids)
+
+                # The page's HTML is already in hand, so scrape its text now
+                # instead of queueing it for a second fetch and parse in
+                # process_all_links; the upsert above guarantees the
+                # processed doc exists
+                processed_doc = processed_collection.find_one({'link': url_to_crawl})
+                if (processed_doc and not processed_doc.get('is_processed')
+                        and not _content_col.find_one({'content_link': url_to_crawl}, {'_id': 1})):
+                    try:
+                        title_text, text = _extract_page_content(url_to_crawl, html)
+                        _content_col_relaxed.insert_one({
+                            'scrapped_content': text,
+                            'content_link': url_to_crawl,
+                            'scrape_date': datetime.now(),
+                            'link_id': processed_doc['_id'],
+                            'source_url': processed_doc.get('source_url', 'unknown'),
+                            'depth': processed_doc.get('depth', current_depth),
+                            'title': title_text,
+                            'word_count': len(text.split())
+                        })
+                        processed_collection.update_one(
+                            {'_id': processed_doc['_id']},
+                            {'$set': {'is_processed': True, 'processed_at': datetime.now()}}
+                        )
+                    except Exception as e:
+                        print(f"Error scraping crawled page {url_to_crawl}: {str(e)}")
+            
+            except requests.exceptions.RequestException as e:
+                error_msg = f"Request error: {str(e)}"
+                links_collection.update_one(
+                    {'_id': link_doc['_id']},
+                    {'$set': {
+                        'is_crawled': True, 
+                        'crawled_at': datetime.now(),
+                        'error': error_msg
+                    }}
+                )
+                continue  # Try the next depth level
+                
+            except Exception as e:
+                error_msg = f"Error: {str(e)}"
+                links_collection.update_one(
+                    {'_id': link_doc['_id']},
+                    {'$set': {
+                        'is_crawled': True, 
+                        'crawled_at': datetime.now(),
+                        'error': error_msg
+                    }}
+                )
+                continue  # Try the next depth level
+        
+        # Return statistics after processing all depths
+        stats = {
+            'links_to_crawl': links_collection.count_documents({'is_crawled': False}),
+            'links_crawled': links_collection.count_documents({'is_crawled': True}),
+            'links_to_scrape': processed_collection.count_documents({'is_processed': False}),
+            'links_scraped': processed_collection.count_documents({'is_processed': True})
+        }
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'Crawling completed for {process_depth} depth levels',
+            'stats': stats,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    except Exception as e:
+        traceback_str = traceback.format_exc()
+        print(f"Error in crawling: {str(e)}\n{traceback_str}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'traceback': traceback_str,
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+async def _fetch_all(urls, concurrency=20):
+    """Fetch all URLs concurrently, returning [(url, html_bytes_or_exception), ...]"""
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {'User-Agent': USER_AGENT}
+
+    async def _fetch(session, url):
+        async with semaphore:
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                    response.raise_for_status()
+
+                    content_type = response.headers.get('Content-Type', '')
+                    if content_type and 'html' not in content_type:
+                        raise ValueError(f"Skipping non-HTML content type: {content_type}")
+
+                    if int(response.headers.get('Content-Length', 0)) > _MAX_BYTES:
+                        raise ValueError(f"Skipping oversized page ({response.headers['Content-Length']} bytes)")
+
+                    return url, await response.content.read(_MAX_BYTES)
+            except Exception as e:
+                return url, e
+
+    async with aiohttp.ClientSession(headers=headers) as session:
+        return await asyncio.gather(*(_fetch(session, url) for url in urls))
+
+# How many links to pull off the cursor and fan out per async batch
+_FETCH_BATCH_SIZE = 100
+
+# How many documents/ops to ship per bulk write
+_WRITE_BATCH_SIZE = 500
+
+# Lazily created process pool for the CPU-bound parse phase; module-global so
+# the fork cost is paid once rather than per request
+_parse_pool = None
+
+def _get_parse_pool():
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _parse_pool
+
+@file_api.route('/process-all-links', methods=['POST'])
+def process_all_links():
+    """Process all unprocessed links in the database at once."""
+    try:
+        # Get collections
+        processed_collection = _processed_col
+        content_collection = _content_col
+
+        # Check how many unprocessed links exist
+        unprocessed_count = processed_collection.count_documents({'is_processed': False})
+
+        if unprocessed_count == 0:
+            return jsonify({
+                'status': 'complete',
+                'message': 'No unprocessed links found',
+                'timestamp': datetime.now().isoformat()
+            })
+
+        # Stream the unprocessed links with a projected, batched cursor
+        # instead of materializing every full document in RAM up front
+        cursor = processed_collection.find(
+            {'is_processed': False},
+            {'link': 1, 'source_url': 1, 'depth': 1}
+        ).batch_size(_FETCH_BATCH_SIZE)
+
+        # Start processing all links
+        results = {
+            'total_unprocessed': unprocessed_count,
+            'processed': 0,
+            'success': 0,
+            'failed': 0,
+            'skipped': 0,
+            'details': []
+        }
+
+        content_docs = []
+        success_details = []
+        processed_ops = []
+
+        def flush_writes():
+            # Ship the accumulated writes in relaxed-durability bulk calls
+            # instead of a round trip per document. Called whenever an
+            # accumulator reaches _WRITE_BATCH_SIZE and once at the end, so
+            # memory and the blast radius of a crash stay bounded to one
+            # write batch; already-flushed links won't be redone on retry
+            # because they no longer match the is_processed:False filter.
+            if content_docs:
+                insert_result = _content_col_relaxed.insert_many(content_docs, ordered=False)
+                for detail, content_id in zip(success_details, insert_result.inserted_ids):
+                    detail['content_id'] = str(content_id)
+                content_docs.clear()
+                success_details.clear()
+
+            if processed_ops:
+                processed_collection.bulk_write(processed_ops, ordered=False)
+                processed_ops.clear()
+
+        def handle_batch(batch):
+            link_docs = {doc['link']: doc for doc in batch}
+
+            # Skip links whose content is already stored — common across
+            # re-crawls and overlapping seeds — before paying for a fetch.
+            # One indexed $in query covers the whole batch.
+            already_scraped = {
+                d['content_link'] for d in content_collection.find(
+                    {'content_link': {'$in': list(link_docs.keys())}},
+                    {'content_link': 1, '_id': 0})
+            }
+            for link in already_scraped:
+                link_doc = link_docs.pop(link)
+                processed_ops.append(UpdateOne(
+                    {'_id': link_doc['_id']},
+                    {'$set': {'is_processed': True, 'processed_at': datetime.now()}}
+                ))
+                results['skipped'] += 1
+                results['processed'] += 1
+                results['details'].append({
+                    'link': link,
+                    'status': 'skipped',
+                    'reason': 'content already scraped'
+                })
+
+            if not link_docs:
+                return
+
+            # Fetch the rest of the batch concurrently; each request is
+            # almost entirely network wait, so the fan-out cuts wall time by
+            # roughly the concurrency factor.
+            fetched = asyncio.run(_fetch_all(list(link_docs.keys())))
+
+            # Parse the successful fetches across cores: the lxml parse and
+            # text extraction are CPU-bound and would serialize under the
+            # GIL on the main process
+            pool = _get_parse_pool()
+            parse_futures = {
+                link: pool.submit(_extract_page_content, link, html)
+                for link, html in fetched if not isinstance(html, Exception)
+            }
+
+            # Collect each result and accumulate the writes
+            for link, html in fetched:
+                handle_fetched(link_docs[link], link, html, parse_futures.get(link))
+                results['processed'] += 1
+
+            if len(content_docs) >= _WRITE_BATCH_SIZE or len(processed_ops) >= _WRITE_BATCH_SIZE:
+                flush_writes()
+
+        def handle_fetched(link_doc, link, html, parse_future=None):
+            if isinstance(html, Exception):
+                error_msg = f"Request error: {str(html)}"
+                results['failed'] += 1
+                results['details'].append({
+                    'link': link,
+                    'status': 'error',
+                    'error': error_msg
+                })
+                processed_ops.append(UpdateOne(
+                    {'_id': link_doc['_id']},
+                    {'$set': {
+                        'is_processed': True,
+                        'processed_at': datetime.now(),
+                        'error': error_msg
+                    }}
+                ))
+            else:
+                try:
+                    # .result() re-raises parse errors from the worker
+                    title_text, text = parse_future.result()
+
+                    content_docs.append({
+                        'scrapped_content': text,
+                        'content_link': link,
+                        'scrape_date': datetime.now(),
+                        'link_id': link_doc['_id'],
+                        'source_url': link_doc.get('source_url', 'unknown'),
+                        'depth': link_doc.get('depth', 0),
+                        'title': title_text,
+                        'word_count': len(text.split())
+                    })
+
+                    detail = {
+                        'link': link,
+                        'status': 'success',
+                        'content_length': len(text),
+                        'title': title_text
+                    }
+                    results['success'] += 1
+                    results['details'].append(detail)
+                    success_details.append(detail)
+
+                    processed_ops.append(UpdateOne(
+                        {'_id': link_doc['_id']},
+                        {'$set': {'is_processed': True, 'processed_at': datetime.now()}}
+                    ))
+
+                except Exception as e:
+                    error_msg = f"Processing error: {str(e)}"
+                    tb = traceback.format_exc()
+                    results['failed'] += 1
+                    results['details'].append({
+                        'link': link,
+                        'status': 'error',
+                        'error': error_msg,
+                        'traceback': tb
+                    })
+                    processed_ops.append(UpdateOne(
+                        {'_id': link_doc['_id']},
+                        {'$set': {
+                            'is_processed': True,
+                            'processed_at': datetime.now(),
+                            'error': error_msg,
+                            'traceback': tb
+                        }}
+                    ))
+
+        # Drain the cursor in fetch-sized batches so memory stays bounded
+        # and the first batch starts before the whole backlog is loaded
+        batch = []
+        for link_doc in cursor:
+            batch.append(link_doc)
+            if len(batch) >= _FETCH_BATCH_SIZE:
+                handle_batch(batch)
+                batch = []
+        if batch:
+            handle_batch(batch)
+
+        # Flush whatever is left below the batch threshold
+        flush_writes()
+
+        # Return results after processing all links
+        return jsonify({
+            'status': 'complete',
+            'message': f'Processed {results["processed"]} links ({results["success"]} success, {results["failed"]} failed)',
+            'results': results,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'traceback': traceback.format_exc(),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+def _extract_page_content(link, html):
+    """Parse fetched HTML and return (title, cleaned_text) for storage"""
+    is_wiki = 'wikipedia.org' in link or 'wiki' in link.lower()
+
+    # Parse the HTML content
+    soup = BeautifulSoup(html, 'lxml')
+
+    # Get title
+    title = soup.find('title')
+    title_text = title.get_text().strip() if title else "Unknown Title"
+
+    # Extract text based on the site type
+    if is_wiki:
+        # For Wikipedia, focus on the content div
+        content_div = soup.find('div', {'id': 'mw-content-text'})
+        if content_div:
+            # Remove unwanted elements
+            for unwanted in content_div.select('.thumb, .navbox, .infobox, table'):
+                if unwanted:
+                    unwanted.extract()
+
+            # Extract text from paragraphs
+            paragraphs = content_div.find_all(['p', 'h2', 'h3', 'h4', 'h5', 'h6'])
+            text_parts = []
+
+            for p in paragraphs:
+                text = p.get_text().strip()
+                if text:
+                    if p.name.startswith('h'):
+                        text_parts.append(f"\n## {text}\n")
+                    else:
+                        text_parts.append(text)
+
+            text = "\n\n".join(text_parts)
+            text = f"# {title_text}\n\n{text}"
+        else:
+            # Fallback to standard extraction
+            for script in soup(["script", "style"]):
+                script.extract()
+            text = soup.get_text(separator=' ', strip=True)
+    else:
+        # Standard extraction for non-Wikipedia sites
+        for script in soup(["script", "style"]):
+            script.extract()
+
+        # Get text and clean it
+        text = soup.get_text(separator=' ', strip=True)
+
+        # Add title to the beginning
+        text = f"# {title_text}\n\n{text}"
+
+    # Remove excessive whitespace
+    text = _BLANKLINE_RE.sub('\n\n', text)
+
+    return title_text, text
+
+@file_api.route('/realtime-stats', methods=['GET'])
+def realtime_stats():
+    """Get real-time statistics for the frontend"""
+    try:
+        # Get collections
+        links_to_scrap_collection = _links_col
+        processed_links_collection = _processed_col
+        scrapped_text_collection = _content_col
+
+        # Fetch all links in Links_to_scrap collection
+        links_to_scrap = list(links_to_scrap_collection.find({}, {'link': 1, '_id': 0}))
+        all_links = [link['link'] for link in links_to_scrap]
+
+        # One aggregation per collection instead of a count_documents call
+        # per stat: grouping Processed_Links by is_processed yields the
+        # total and pending counts together
+        processed_counts = {
+            d['_id']: d['n'] for d in processed_links_collection.aggregate([
+                {'$group': {'_id': '$is_processed', 'n': {'$sum': 1}}}
+            ])
+        }
+        total_number_of_links = sum(processed_counts.values())
+        pending_links = processed_counts.get(False, 0)
+
+        # Likewise fold the scrapped-links count and total word sum into a
+        # single $group, so only two small numbers cross the network
+        content_agg = list(scrapped_text_collection.aggregate([
+            {'$group': {'_id': None, 'docs': {'$sum': 1}, 'total_words': {'$sum': '$word_count'}}}
+        ]))
+        scrapped_links_count = content_agg[0]['docs'] if content_agg else 0
+        total_words_scrapped = content_agg[0]['total_words'] if content_agg else 0
+
+        # Prepare response
+        response = {
+            'Links': all_links,
+            'Total_Number_of_Links': total_number_of_links,
+            'Scrapped_Links': scrapped_links_count,  # Number of links in scrapped_text collection
+            'Pending_Links': pending_links,
+            'Total_Words_Scrapped': total_words_scrapped
+        }
+
+        return jsonify({
+            'status': 'success',
+            'data': response,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'traceback': traceback.format_exc(),
+            'timestamp': datetime.now().isoformat()
+        }), 500
\ No newline at end of file